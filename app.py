@@ -9,31 +9,88 @@ SISTEMA COMPLETO DE FORWARD TESTING - SOL/USDT
 """
 
 from flask import Flask, render_template, jsonify, request
-import threading
+from flask.json.provider import DefaultJSONProvider
+from concurrent.futures import ThreadPoolExecutor
 import json
 import os
+import threading
+import traceback
+import pandas as pd
 from datetime import datetime, timedelta
 from forward_tester import ForwardTester
 from divergence_analyzer import DivergenceAnalyzer
 from telegram_notifier import TelegramNotifier
 
+try:
+    import orjson
+    ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC
+except ImportError:  # orjson é opcional
+    orjson = None
+
+def dumps_json(obj, indent=False):
+    """Serializa para JSON (bytes), com orjson quando disponível"""
+    if orjson is not None:
+        option = ORJSON_OPTIONS | orjson.OPT_INDENT_2 if indent else ORJSON_OPTIONS
+        return orjson.dumps(obj, default=str, option=option)
+    if indent:
+        return json.dumps(obj, default=str, indent=2).encode()
+    return json.dumps(obj, default=str, separators=(',', ':')).encode()
+
+def loads_json(data):
+    """Desserializa JSON (str ou bytes), com orjson quando disponível"""
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Provider JSON do Flask baseado em orjson (payloads grandes de trades/equity)"""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=ORJSON_OPTIONS).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'sua_chave_secreta_aqui'  # Mude para produção
+if orjson is not None:
+    app.json = OrjsonProvider(app)
 
 # Configurações globais
 CONFIG_FILE = 'config.json'
 RESULTS_FILE = 'results.json'
+TRADES_LOG_FILE = 'results.trades.jsonl'
+
+# Pool compartilhado para backtests (os kernels numba liberam o GIL)
+executor = ThreadPoolExecutor(max_workers=os.cpu_count(), thread_name_prefix='backtest')
+
+def _log_failure(future):
+    """Imprime o traceback de tarefas em background que falharam"""
+    exc = future.exception()
+    if exc is not None:
+        print("❌ Erro no forward testing em background:")
+        traceback.print_exception(type(exc), exc, exc.__traceback__)
 
 # Inicializa módulos
 forward_tester = None
 divergence_analyzer = DivergenceAnalyzer()
 telegram_notifier = TelegramNotifier()
 
+# Cache da configuração, invalidado pelo mtime do arquivo
+_config_cache = {'stamp': None, 'config': None}
+
 # Carrega ou cria configuração
 def load_config():
-    if os.path.exists(CONFIG_FILE):
-        with open(CONFIG_FILE, 'r') as f:
-            return json.load(f)
+    try:
+        st = os.stat(CONFIG_FILE)
+    except FileNotFoundError:
+        st = None
+    
+    if st is not None:
+        stamp = (st.st_mtime_ns, st.st_size)
+        if _config_cache['stamp'] != stamp:
+            with open(CONFIG_FILE, 'rb') as f:
+                _config_cache['config'] = loads_json(f.read())
+            _config_cache['stamp'] = stamp
+        return dict(_config_cache['config'])
     return {
         'timeframe': '15m',
         'days': 15,
@@ -50,13 +107,13 @@ def load_config():
     }
 
 def save_config(config):
-    with open(CONFIG_FILE, 'w') as f:
-        json.dump(config, f, indent=2)
+    with open(CONFIG_FILE, 'wb') as f:
+        f.write(dumps_json(config, indent=True))
 
 def load_results():
     if os.path.exists(RESULTS_FILE):
-        with open(RESULTS_FILE, 'r') as f:
-            return json.load(f)
+        with open(RESULTS_FILE, 'rb') as f:
+            return loads_json(f.read())
     return {
         'trades': [],
         'equity_curve': [],
@@ -66,8 +123,26 @@ def load_results():
     }
 
 def save_results(results):
-    with open(RESULTS_FILE, 'w') as f:
-        json.dump(results, f, indent=2, default=str)
+    """Grava o snapshot agregado em results.json (sem indentação)"""
+    with open(RESULTS_FILE, 'wb') as f:
+        f.write(dumps_json(results))
+
+# Log de trades append-only, aberto uma única vez
+_trades_log = None
+_trades_log_lock = threading.Lock()
+
+def append_trades(trades):
+    """Acrescenta trades ao log JSONL com uma única escrita"""
+    global _trades_log
+    if not trades:
+        return
+    
+    payload = b''.join(dumps_json(trade) + b'\n' for trade in trades)
+    with _trades_log_lock:
+        if _trades_log is None:
+            _trades_log = open(TRADES_LOG_FILE, 'ab')
+        _trades_log.write(payload)
+        _trades_log.flush()
 
 @app.route('/')
 def index():
@@ -122,10 +197,13 @@ def run_backtest():
             trading_hours=config['trading_hours']
         )
         
-        results = forward_tester.run(df, days_to_test=days)
+        results = executor.submit(forward_tester.run, df, days_to_test=days).result()
         
         # Analisa divergências
-        divergences = divergence_analyzer.analyze(df, results['trades_df'] if 'trades_df' in results else None)
+        divergences = executor.submit(
+            divergence_analyzer.analyze, forward_tester.calculate_indicators(df),
+            results['trades_df'] if 'trades_df' in results else None
+        ).result()
         
         # Prepara resultados
         output = {
@@ -190,11 +268,15 @@ def start_forward_test():
         )
         
         results = tester.run(df, simulate_real_time=True)
+        
+        # Trades vão para o log JSONL; o snapshot guarda só o agregado
+        trades_df = results.pop('trades_df', None)
+        if trades_df is not None:
+            append_trades(trades_df.to_dict('records'))
         save_results(results)
     
-    # Executa em thread separada
-    thread = threading.Thread(target=run_test)
-    thread.start()
+    # Executa em background no pool compartilhado
+    executor.submit(run_test).add_done_callback(_log_failure)
     
     return jsonify({'status': 'started', 'message': 'Forward testing iniciado em background'})
 
@@ -239,6 +321,14 @@ if __name__ == '__main__':
     print("="*80)
     print("🚀 SISTEMA DE FORWARD TESTING - SOL/USDT")
     print("="*80)
+    
+    # Servidor de desenvolvimento só com FLASK_DEBUG; produção via WSGI (wsgi.py)
+    if os.environ.get('FLASK_DEBUG', '').lower() not in ('1', 'true', 'yes'):
+        print("\n⚠️  Para produção use: gunicorn -w 4 -k gthread --threads 8 wsgi:app")
+        print("   Para o servidor de desenvolvimento defina FLASK_DEBUG=1")
+        print("="*80)
+        raise SystemExit(1)
+    
     print("\n✅ Servidor iniciado: http://localhost:5000")
     print("   • Interface web com dashboard completo")
     print("   • Análise de divergência entre indicadores")
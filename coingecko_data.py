@@ -4,7 +4,12 @@ MÓDULO DE DADOS COINGECKO
 Busca dados OHLC para backtest e forward testing
 """
 
+import json
+import os
+import tempfile
+import time
 import requests
+import numpy as np
 import pandas as pd
 from datetime import datetime, timezone
 
@@ -12,21 +17,95 @@ class CoinGeckoData:
     """Busca dados históricos da CoinGecko"""
     
     BASE_URL = "https://api.coingecko.com/api/v3"
+    CACHE_DIR = ".cache"
+    
+    @staticmethod
+    def cache_ttl(days):
+        """Validade do cache em segundos conforme a granularidade dos candles"""
+        if days <= 1:
+            return 60      # 1m
+        if days <= 7:
+            return 5 * 60  # 5m
+        return 15 * 60     # 15m
+    
+    def _cache_paths(self, coin_id, days, vs_currency):
+        base = os.path.join(self.CACHE_DIR, f"coingecko_{coin_id}_{days}_{vs_currency}")
+        return f"{base}.pkl", f"{base}.meta.json"
+    
+    def _load_cache_meta(self, data_path, meta_path):
+        if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+            return None
+        try:
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return meta if isinstance(meta, dict) else None
+    
+    def _atomic_write(self, path, write):
+        """Grava em um temporário exclusivo e troca atomicamente (escritores concorrentes não colidem)"""
+        os.makedirs(self.CACHE_DIR, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=self.CACHE_DIR, suffix='.tmp', delete=False) as f:
+            tmp_path = f.name
+        try:
+            write(tmp_path)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+    
+    def _save_cache(self, df, data_path, meta_path, etag):
+        try:
+            self._atomic_write(data_path, df.to_pickle)
+        except OSError as e:
+            print(f"⚠️  Falha ao gravar cache: {e}")
+            return
+        self._save_cache_meta(meta_path, etag)
+    
+    def _save_cache_meta(self, meta_path, etag):
+        def write(path):
+            with open(path, 'w') as f:
+                json.dump({'fetched_at': time.time(), 'etag': etag}, f)
+        try:
+            self._atomic_write(meta_path, write)
+        except OSError as e:
+            print(f"⚠️  Falha ao gravar cache: {e}")
     
     def get_ohlc_days(self, coin_id, days, vs_currency="usd"):
         """
         Obtém dados OHLC para múltiplos dias
         days=1 → 1m | days=7 → 5m | days>7 → 15m
+        Respostas ficam em cache no disco (TTL por granularidade + ETag)
         """
+        data_path, meta_path = self._cache_paths(coin_id, days, vs_currency)
+        meta = self._load_cache_meta(data_path, meta_path)
+        
+        if meta and time.time() - meta.get('fetched_at', 0) < self.cache_ttl(days):
+            df = pd.read_pickle(data_path)
+            print(f"📦 Cache {coin_id.upper()}/USD ({days} dias): {len(df)} candles")
+            return df
+        
         url = f"{self.BASE_URL}/coins/{coin_id}/ohlc"
         params = {
             'vs_currency': vs_currency,
             'days': days
         }
+        headers = {'If-None-Match': meta['etag']} if meta and meta.get('etag') else {}
         
         print(f"📥 Baixando {days} dias de dados {coin_id.upper()}/USD...")
         try:
-            response = requests.get(url, params=params, timeout=30)
+            response = requests.get(url, params=params, headers=headers, timeout=30)
+            
+            # Dados inalterados: renova o cache local
+            if response.status_code == 304:
+                self._save_cache_meta(meta_path, meta['etag'])
+                df = pd.read_pickle(data_path)
+                print(f"✅ Dados inalterados (cache): {len(df)} candles")
+                return df
+            
             response.raise_for_status()
             data = response.json()
             
@@ -41,9 +120,24 @@ class CoinGeckoData:
             # Volume estimado
             df['volume'] = ((df['high'] - df['low']) / df['close'] * 100000).clip(1000, 500000)
             
+            # float32 basta para a precisão dos preços e reduz a banda de memória à metade
+            for col in ['open', 'high', 'low', 'close', 'volume']:
+                df[col] = df[col].astype(np.float32)
+            
+            self._save_cache(df, data_path, meta_path, response.headers.get('ETag'))
+            
             print(f"✅ Dados carregados: {len(df)} candles")
             return df
             
         except requests.exceptions.RequestException as e:
             print(f"❌ Erro na API CoinGecko: {e}")
+            
+            # Falha na atualização: serve o cache vencido, se existir
+            if os.path.exists(data_path):
+                try:
+                    df = pd.read_pickle(data_path)
+                except Exception:
+                    raise e
+                print(f"⚠️  Usando cache vencido: {len(df)} candles")
+                return df
             raise
@@ -5,145 +5,228 @@ Identifica divergências entre preço e indicadores (MACD, RSI, Volume)
 Calcula taxa de erro e impacto nas operações
 """
 
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 import numpy as np
+from numba_compat import njit
+
+BEARISH, BULLISH = 1, -1
+
+# Pool dedicado aos detectores (RSI, MACD, Volume)
+_DETECTOR_POOL = ThreadPoolExecutor(max_workers=3, thread_name_prefix='divergence')
+
+
+@njit(cache=True, nogil=True)
+def _rsi_divergence_kernel(highs, lows, rsi, window):
+    """
+    Posições das divergências RSI e seu tipo (BEARISH/BULLISH), em ordem cronológica
+    Topo/fundo: extremo estrito em relação às janelas anterior e seguinte
+    """
+    n = len(highs)
+    pos = np.empty(2 * n, dtype=np.int64)
+    kind = np.empty(2 * n, dtype=np.int8)
+    count = 0
+    
+    for i in range(window, n - window):
+        # Primeiro máximo/mínimo da janela anterior e extremos da seguinte
+        prev_high = i - window
+        prev_low = i - window
+        for j in range(i - window + 1, i):
+            if highs[j] > highs[prev_high]:
+                prev_high = j
+            if lows[j] < lows[prev_low]:
+                prev_low = j
+        next_high = highs[i + 1]
+        next_low = lows[i + 1]
+        for j in range(i + 2, i + window + 1):
+            next_high = max(next_high, highs[j])
+            next_low = min(next_low, lows[j])
+        
+        # Preço fez topo mais alto e RSI topo mais baixo
+        if (highs[i] > highs[prev_high] and highs[i] > next_high and
+                rsi[i] < rsi[prev_high] - 5):
+            pos[count] = i
+            kind[count] = BEARISH
+            count += 1
+        
+        # Preço fez fundo mais baixo e RSI fundo mais alto
+        if (lows[i] < lows[prev_low] and lows[i] < next_low and
+                rsi[i] > rsi[prev_low] + 5):
+            pos[count] = i
+            kind[count] = BULLISH
+            count += 1
+    
+    return pos[:count], kind[:count]
+
+
+@njit(cache=True, nogil=True)
+def _macd_divergence_kernel(highs, macd, window):
+    """Posições em que o MACD faz topo mas o preço não confirma"""
+    n = len(highs)
+    pos = np.empty(n, dtype=np.int64)
+    count = 0
+    
+    for i in range(window, n - window):
+        # Topos MACD
+        is_top = True
+        for j in range(i - window, i + window + 1):
+            if j != i and macd[j] >= macd[i]:
+                is_top = False
+                break
+        if not is_top:
+            continue
+        
+        prev_high = i - window
+        for j in range(i - window + 1, i):
+            if highs[j] > highs[prev_high]:
+                prev_high = j
+        
+        # Preço não confirma
+        prev_price_high = highs[prev_high]
+        if highs[i] < prev_price_high - (prev_price_high * 0.005):
+            pos[count] = i
+            count += 1
+    
+    return pos[:count]
+
+
+@njit(cache=True, nogil=True)
+def _volume_divergence_kernel(volume, ema7, ema21, window):
+    """Posições com volume 30% abaixo da média recente em tendência de alta"""
+    n = len(volume)
+    pos = np.empty(n, dtype=np.int64)
+    count = 0
+    total = 0.0
+    for j in range(min(window, n)):
+        total += volume[j]
+    
+    for i in range(window, n):
+        if ema7[i] > ema21[i] and volume[i] < (total / window) * 0.7:
+            pos[count] = i
+            count += 1
+        total += volume[i] - volume[i - window]
+    
+    return pos[:count]
+
 
 class DivergenceAnalyzer:
+    CACHE_SIZE = 32
+    
     def __init__(self):
         self.divergences = []
+        self._cache = {}
+        self._cache_lock = threading.Lock()
+    
+    def _fingerprint(self, df):
+        """Chave do cache: tamanho, primeiro/último timestamp e último fechamento"""
+        if len(df) == 0:
+            return None
+        ts = df['timestamp']
+        return (len(df), int(ts.iloc[0].value), int(ts.iloc[-1].value),
+                float(df['close'].iloc[-1]))
+    
+    def _detect_all(self, df):
+        """Executa os detectores, reaproveitando o resultado para dados idênticos"""
+        key = self._fingerprint(df)
+        with self._cache_lock:
+            cached = self._cache.get(key)
+        
+        if cached is None:
+            # Kernels liberam o GIL: os três detectores rodam em paralelo
+            futures = [_DETECTOR_POOL.submit(detect, df) for detect in
+                       (self.detect_rsi_divergence, self.detect_macd_divergence,
+                        self.detect_volume_divergence)]
+            cached = [div for future in futures for div in future.result()]
+            if key is not None:
+                with self._cache_lock:
+                    self._cache[key] = cached
+                    while len(self._cache) > self.CACHE_SIZE:
+                        self._cache.pop(next(iter(self._cache)))  # FIFO
+        
+        # Cópias: a correlação com trades altera os dicionários
+        return [dict(div) for div in cached]
+    
+    def _to_records(self, df, positions, **fields):
+        """Monta a lista de divergências para as posições (iloc) informadas"""
+        if len(positions) == 0:
+            return []
+        
+        records = pd.DataFrame({
+            'timestamp': [ts.isoformat() for ts in df['timestamp'].iloc[positions]],
+            **fields,
+            'price': df['close'].to_numpy()[positions]
+        })
+        return records.to_dict('records')
     
     def detect_rsi_divergence(self, df, window=5):
         """Detecta divergência RSI (clássica e oculta)"""
-        divergences = []
-        
-        for i in range(window, len(df) - window):
-            # Verifica topos
-            if (df['high'].iloc[i] > df['high'].iloc[i-window:i].max() and
-                df['high'].iloc[i] > df['high'].iloc[i+1:i+window+1].max()):
-                
-                # Preço fez topo mais alto
-                price_high = df['high'].iloc[i]
-                prev_high_idx = df['high'].iloc[i-window:i].idxmax()
-                prev_price_high = df['high'].loc[prev_high_idx]
-                
-                if price_high > prev_price_high:
-                    # Verifica RSI
-                    rsi_current = df['rsi'].iloc[i]
-                    rsi_prev = df['rsi'].loc[prev_high_idx]
-                    
-                    if rsi_current < rsi_prev - 5:  # RSI divergente
-                        divergences.append({
-                            'timestamp': df['timestamp'].iloc[i].isoformat(),
-                            'type': 'BEARISH',
-                            'indicator': 'RSI',
-                            'price_action': 'Topo mais alto',
-                            'indicator_action': 'Topo mais baixo',
-                            'severity': 'HIGH' if rsi_current < 50 else 'MEDIUM',
-                            'price': df['close'].iloc[i]
-                        })
-            
-            # Verifica fundos
-            if (df['low'].iloc[i] < df['low'].iloc[i-window:i].min() and
-                df['low'].iloc[i] < df['low'].iloc[i+1:i+window+1].min()):
-                
-                price_low = df['low'].iloc[i]
-                prev_low_idx = df['low'].iloc[i-window:i].idxmin()
-                prev_price_low = df['low'].loc[prev_low_idx]
-                
-                if price_low < prev_price_low:
-                    rsi_current = df['rsi'].iloc[i]
-                    rsi_prev = df['rsi'].loc[prev_low_idx]
-                    
-                    if rsi_current > rsi_prev + 5:  # RSI divergente
-                        divergences.append({
-                            'timestamp': df['timestamp'].iloc[i].isoformat(),
-                            'type': 'BULLISH',
-                            'indicator': 'RSI',
-                            'price_action': 'Fundo mais baixo',
-                            'indicator_action': 'Fundo mais alto',
-                            'severity': 'HIGH' if rsi_current > 50 else 'MEDIUM',
-                            'price': df['close'].iloc[i]
-                        })
-        
-        return divergences
+        rsi = df['rsi'].to_numpy()
+        pos, kind = _rsi_divergence_kernel(df['high'].to_numpy(), df['low'].to_numpy(),
+                                           rsi, window)
+        bearish = kind == BEARISH
+        
+        return self._to_records(df, pos,
+                                type=np.where(bearish, 'BEARISH', 'BULLISH'),
+                                indicator='RSI',
+                                price_action=np.where(bearish, 'Topo mais alto', 'Fundo mais baixo'),
+                                indicator_action=np.where(bearish, 'Topo mais baixo', 'Fundo mais alto'),
+                                severity=np.where(np.where(bearish, rsi[pos] < 50, rsi[pos] > 50),
+                                                  'HIGH', 'MEDIUM'))
     
     def detect_macd_divergence(self, df, window=5):
         """Detecta divergência MACD"""
-        divergences = []
-        
-        for i in range(window, len(df) - window):
-            # Topos MACD
-            if (df['macd'].iloc[i] > df['macd'].iloc[i-window:i].max() and
-                df['macd'].iloc[i] > df['macd'].iloc[i+1:i+window+1].max()):
-                
-                price_high = df['high'].iloc[i]
-                prev_high_idx = df['high'].iloc[i-window:i].idxmax()
-                prev_price_high = df['high'].loc[prev_high_idx]
-                
-                if price_high < prev_price_high - (prev_price_high * 0.005):  # Preço não confirma
-                    divergences.append({
-                        'timestamp': df['timestamp'].iloc[i].isoformat(),
-                        'type': 'BEARISH',
-                        'indicator': 'MACD',
-                        'price_action': 'Preço não confirma topo MACD',
-                        'indicator_action': 'MACD topo mais alto',
-                        'severity': 'HIGH',
-                        'price': df['close'].iloc[i]
-                    })
-        
-        return divergences
+        pos = _macd_divergence_kernel(df['high'].to_numpy(), df['macd'].to_numpy(), window)
+        
+        return self._to_records(df, pos,
+                                type='BEARISH',
+                                indicator='MACD',
+                                price_action='Preço não confirma topo MACD',
+                                indicator_action='MACD topo mais alto',
+                                severity='HIGH')
     
     def detect_volume_divergence(self, df, window=10):
         """Detecta divergência de volume (volume decrescente em tendência)"""
-        divergences = []
-        
-        for i in range(window, len(df)):
-            # Volume decrescente em tendência de alta
-            if df['ema7'].iloc[i] > df['ema21'].iloc[i]:  # Tendência alta
-                recent_volume = df['volume_usdt'].iloc[i-window:i].mean()
-                current_volume = df['volume_usdt'].iloc[i]
-                
-                if current_volume < recent_volume * 0.7:  # Volume 30% menor
-                    divergences.append({
-                        'timestamp': df['timestamp'].iloc[i].isoformat(),
-                        'type': 'WARNING',
-                        'indicator': 'Volume',
-                        'price_action': 'Tendência alta com volume decrescente',
-                        'indicator_action': 'Volume 30% abaixo da média',
-                        'severity': 'MEDIUM',
-                        'price': df['close'].iloc[i]
-                    })
-        
-        return divergences
+        pos = _volume_divergence_kernel(df['volume_usdt'].to_numpy(), df['ema7'].to_numpy(),
+                                        df['ema21'].to_numpy(), window)
+        
+        return self._to_records(df, pos,
+                                type='WARNING',
+                                indicator='Volume',
+                                price_action='Tendência alta com volume decrescente',
+                                indicator_action='Volume 30% abaixo da média',
+                                severity='MEDIUM')
     
     def analyze(self, df, trades_df=None):
         """Análise completa de divergências"""
-        all_divergences = []
-        
         # Detecta divergências
-        rsi_divs = self.detect_rsi_divergence(df)
-        macd_divs = self.detect_macd_divergence(df)
-        volume_divs = self.detect_volume_divergence(df)
-        
-        all_divergences.extend(rsi_divs)
-        all_divergences.extend(macd_divs)
-        all_divergences.extend(volume_divs)
+        all_divergences = self._detect_all(df)
         
         # Correlaciona com trades (se disponível)
-        if trades_df is not None and len(all_divergences) > 0:
-            for div in all_divergences:
-                div_time = pd.to_datetime(div['timestamp'])
-                
-                # Verifica se divergência impactou algum trade
-                for _, trade in trades_df.iterrows():
-                    entry_time = pd.to_datetime(trade['entry_time'])
-                    exit_time = pd.to_datetime(trade['exit_time'])
-                    
-                    if entry_time <= div_time <= exit_time:
-                        div['impacted_trade'] = True
-                        div['trade_side'] = trade['side']
-                        div['trade_result'] = 'WIN' if trade['pnl_pct'] > 0 else 'LOSS'
-                        break
+        if trades_df is not None and len(trades_df) > 0 and len(all_divergences) > 0:
+            trades = pd.IntervalIndex.from_arrays(
+                pd.to_datetime(trades_df['entry_time']),
+                pd.to_datetime(trades_df['exit_time']),
+                closed='both'
+            )
+            div_times = pd.DatetimeIndex([div['timestamp'] for div in all_divergences])
+            sides = trades_df['side'].tolist()
+            wins = trades_df['pnl_pct'].to_numpy() > 0
+            
+            # Verifica se divergência impactou algum trade
+            if trades.is_non_overlapping_monotonic:
+                positions = trades.get_indexer(div_times)
+            else:
+                # Trades repetidos/sobrepostos: primeiro trade (na ordem do frame) que contém a divergência
+                t = div_times.asi8[:, None]
+                hits = (trades.left.asi8 <= t) & (t <= trades.right.asi8)
+                positions = np.where(hits.any(axis=1), hits.argmax(axis=1), -1)
+            
+            for div, pos in zip(all_divergences, positions):
+                if pos >= 0:
+                    div['impacted_trade'] = True
+                    div['trade_side'] = sides[pos]
+                    div['trade_result'] = 'WIN' if wins[pos] else 'LOSS'
         
         # Ordena por timestamp
         all_divergences.sort(key=lambda x: x['timestamp'])
@@ -7,9 +7,207 @@ Simula operações reais com gestão de risco e notificações
 import pandas as pd
 import numpy as np
 from datetime import datetime
-import time
+from numba_compat import njit
 from telegram_notifier import TelegramNotifier
 
+SIDE_LONG, SIDE_SHORT = 1, -1
+REASON_STOP_LOSS, REASON_TAKE_PROFIT = 0, 1
+
+
+@njit(cache=True, nogil=True)
+def _run_loop(close, ema6, ema7, ema21, ok, macd_bull, macd_bear,
+              fees, sl_pct, tp_pct, start=30):
+    """
+    Máquina de estados do forward testing sobre arrays NumPy
+    ok: candles que passam nos filtros (horário, volume e Bollinger)
+    Retorna um registro por entrada; exit_idx = -1 para posição ainda aberta
+    """
+    n = len(close)
+    size = max(n - start, 0)
+    entry_idx = np.empty(size, dtype=np.int64)
+    exit_idx = np.empty(size, dtype=np.int64)
+    side_code = np.empty(size, dtype=np.int8)
+    entry_price = np.empty(size, dtype=np.float64)
+    exit_price = np.empty(size, dtype=np.float64)
+    reason_code = np.empty(size, dtype=np.int8)
+    
+    count = 0
+    position = 0
+    entry = 0.0
+    
+    for i in range(start, n):
+        price = close[i]
+        
+        # Filtros
+        if not ok[i]:
+            continue
+        
+        # Entrada
+        if position == 0:
+            if macd_bull[i] and price > ema6[i] and ema7[i] > ema21[i]:
+                position = SIDE_LONG
+                entry = price * (1 + fees)
+            elif macd_bear[i] and price < ema6[i] and ema7[i] < ema21[i]:
+                position = SIDE_SHORT
+                entry = price * (1 - fees)
+            else:
+                continue
+            
+            entry_idx[count] = i
+            exit_idx[count] = -1
+            side_code[count] = position
+            entry_price[count] = entry
+            exit_price[count] = np.nan
+            reason_code[count] = -1
+            count += 1
+            continue
+        
+        # Saída
+        reason = -1
+        if position == SIDE_LONG:
+            if price <= entry * (1 - sl_pct):
+                reason = REASON_STOP_LOSS
+            elif price >= entry * (1 + tp_pct):
+                reason = REASON_TAKE_PROFIT
+            exit_fill = price * (1 - fees)
+        else:
+            if price >= entry * (1 + sl_pct):
+                reason = REASON_STOP_LOSS
+            elif price <= entry * (1 - tp_pct):
+                reason = REASON_TAKE_PROFIT
+            exit_fill = price * (1 + fees)
+        
+        if reason >= 0:
+            exit_idx[count - 1] = i
+            exit_price[count - 1] = exit_fill
+            reason_code[count - 1] = reason
+            position = 0
+    
+    return (entry_idx[:count], exit_idx[:count], side_code[:count],
+            entry_price[:count], exit_price[:count], reason_code[:count])
+
+
+@njit(cache=True, nogil=True)
+def _ema(x, span):
+    """EMA recursiva, equivalente a ewm(span=span, adjust=False).mean()"""
+    alpha = 2.0 / (span + 1.0)
+    out = np.empty_like(x)
+    if len(x) == 0:
+        return out
+    
+    out[0] = x[0]
+    for i in range(1, len(x)):
+        out[i] = alpha * x[i] + (1.0 - alpha) * out[i - 1]
+    return out
+
+
+@njit(cache=True, nogil=True)
+def _macd_crosses(close, fast=12, slow=26, signal_span=9):
+    """
+    MACD, linha de sinal e cruzamentos calculados em uma única passada
+    Retorna (macd, sinal, diferença, cruzamento de alta, cruzamento de baixa)
+    """
+    n = len(close)
+    macd = np.empty_like(close)
+    signal = np.empty_like(close)
+    diff = np.empty_like(close)
+    bullish = np.zeros(n, dtype=np.bool_)
+    bearish = np.zeros(n, dtype=np.bool_)
+    if n == 0:
+        return macd, signal, diff, bullish, bearish
+    
+    a_fast = 2.0 / (fast + 1.0)
+    a_slow = 2.0 / (slow + 1.0)
+    a_signal = 2.0 / (signal_span + 1.0)
+    e_fast = close[0]
+    e_slow = close[0]
+    sig = e_fast - e_slow
+    prev_diff = 0.0
+    
+    for i in range(n):
+        if i > 0:
+            e_fast = a_fast * close[i] + (1.0 - a_fast) * e_fast
+            e_slow = a_slow * close[i] + (1.0 - a_slow) * e_slow
+            sig = a_signal * (e_fast - e_slow) + (1.0 - a_signal) * sig
+        
+        macd[i] = e_fast - e_slow
+        signal[i] = sig
+        d = (e_fast - e_slow) - sig
+        diff[i] = d
+        if i > 0:
+            bullish[i] = d > 0 and prev_diff <= 0
+            bearish[i] = d < 0 and prev_diff >= 0
+        prev_diff = d
+    return macd, signal, diff, bullish, bearish
+
+
+@njit(cache=True, nogil=True)
+def _rolling_mean_std(x, window):
+    """Média e desvio padrão (ddof=1) móveis calculados em uma única passada"""
+    n = len(x)
+    mean = np.full_like(x, np.nan)
+    std = np.full_like(x, np.nan)
+    if n < window:
+        return mean, std
+    
+    # Média e M2 atualizados incrementalmente (Welford com janela deslizante), sempre
+    # em float64: mesmo com preços em float32 não há cancelamento quando o preço deriva
+    m = 0.0
+    m2 = 0.0
+    for i in range(window):
+        v = np.float64(x[i])
+        delta = v - m
+        m += delta / (i + 1)
+        m2 += delta * (v - m)
+    for i in range(window - 1, n):
+        if i >= window:
+            v_new = np.float64(x[i])
+            v_old = np.float64(x[i - window])
+            m_old = m
+            m += (v_new - v_old) / window
+            m2 += (v_new - v_old) * (v_new - m + v_old - m_old)
+        mean[i] = m
+        var = m2 / (window - 1)
+        std[i] = np.sqrt(var) if var > 0.0 else 0.0
+    return mean, std
+
+
+@njit(cache=True, nogil=True)
+def _rsi(x, window):
+    """RSI com médias móveis simples de ganhos e perdas"""
+    n = len(x)
+    out = np.full_like(x, np.nan)
+    gain_sum = 0.0
+    loss_sum = 0.0
+    gain_count = 0
+    loss_count = 0
+    
+    for i in range(n):
+        delta = x[i] - x[i - 1] if i > 0 else 0.0
+        if delta > 0:
+            gain_sum += delta
+            gain_count += 1
+        elif delta < 0:
+            loss_sum -= delta
+            loss_count += 1
+        
+        if i >= window:
+            old = x[i - window] - x[i - window - 1] if i > window else 0.0
+            if old > 0:
+                gain_sum -= old
+                gain_count -= 1
+            elif old < 0:
+                loss_sum += old
+                loss_count -= 1
+        
+        # Sem perdas na janela o RSI fica indefinido (preenchido com 0 depois)
+        if i >= window - 1 and loss_count > 0:
+            gain = gain_sum / window if gain_count > 0 else 0.0
+            rs = gain / (loss_sum / window)
+            out[i] = 100 - (100 / (1 + rs))
+    return out
+
+
 class ForwardTester:
     def __init__(self, position_size=40.0, fees=0.0015, stop_loss=0.8, 
                  take_profit=1.5, volume_min=75000, trading_hours=None,
@@ -20,8 +218,12 @@ class ForwardTester:
         self.take_profit_pct = take_profit / 100
         self.volume_min = volume_min
         self.trading_hours = trading_hours or [[7, 10], [12, 16]]
-        self.trades = []
+        self._hours_mask = np.zeros(24, dtype=np.bool_)
+        for start, end in self.trading_hours:
+            self._hours_mask[start:end] = True
         self.equity_curve = []
+        self._tz = None
+        self._alloc_trades(0)
         self.enable_telegram = enable_telegram
         self.telegram = TelegramNotifier() if enable_telegram else None
         
@@ -30,191 +232,224 @@ class ForwardTester:
     
     def calculate_indicators(self, df):
         """Calcula indicadores técnicos"""
-        df = df.copy()
+        # Mantém float32 quando os preços já vêm nessa precisão
+        close = df['close'].to_numpy()
+        if close.dtype.kind != 'f':
+            close = close.astype(np.float64)
         
         # MACD
-        exp1 = df['close'].ewm(span=12, adjust=False).mean()
-        exp2 = df['close'].ewm(span=26, adjust=False).mean()
-        df['macd'] = exp1 - exp2
-        df['macd_signal'] = df['macd'].ewm(span=9, adjust=False).mean()
-        df['macd_diff'] = df['macd'] - df['macd_signal']
-        df['macd_prev'] = df['macd_diff'].shift(1)
-        df['macd_bullish'] = (df['macd_diff'] > 0) & (df['macd_prev'] <= 0)
-        df['macd_bearish'] = (df['macd_diff'] < 0) & (df['macd_prev'] >= 0)
-        
-        # EMAs
-        df['ema6'] = df['close'].ewm(span=6, adjust=False).mean()
-        df['ema7'] = df['close'].ewm(span=7, adjust=False).mean()
-        df['ema21'] = df['close'].ewm(span=21, adjust=False).mean()
+        macd, macd_signal, macd_diff, macd_bullish, macd_bearish = _macd_crosses(close)
         
         # Bollinger
-        df['bb_mid'] = df['close'].rolling(window=20).mean()
-        df['bb_std'] = df['close'].rolling(window=20).std()
-        df['bb_high'] = df['bb_mid'] + (df['bb_std'] * 2)
-        df['bb_low'] = df['bb_mid'] - (df['bb_std'] * 2)
-        df['bb_width'] = ((df['bb_high'] - df['bb_low']) / df['close']) * 100
-        df['bb_width_prev'] = df['bb_width'].shift(1)
-        df['bb_expanding'] = ((df['bb_width'] - df['bb_width_prev']) / 
-                             df['bb_width_prev'].replace(0, np.nan) * 100) > 0.5
-        
-        # RSI
-        delta = df['close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss.replace(0, np.nan)
-        df['rsi'] = 100 - (100 / (1 + rs))
-        
-        # Volume
-        df['volume_usdt'] = df['volume'] * df['close']
-        
-        return df.fillna(0)
+        bb_mid, bb_std = _rolling_mean_std(close, 20)
+        bb_high = bb_mid + (bb_std * 2)
+        bb_low = bb_mid - (bb_std * 2)
+        bb_width = ((bb_high - bb_low) / close) * 100
+        bb_width_prev = np.concatenate((np.full(1, np.nan, dtype=close.dtype), bb_width[:-1]))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            bb_change = (bb_width - bb_width_prev) / np.where(bb_width_prev == 0, np.nan, bb_width_prev) * 100
+        
+        out = {
+            'macd': macd,
+            'macd_signal': macd_signal,
+            'macd_diff': macd_diff,
+            'macd_bullish': macd_bullish,
+            'macd_bearish': macd_bearish,
+            # EMAs
+            'ema6': _ema(close, 6),
+            'ema7': _ema(close, 7),
+            'ema21': _ema(close, 21),
+            'bb_mid': bb_mid,
+            'bb_std': bb_std,
+            'bb_high': bb_high,
+            'bb_low': bb_low,
+            'bb_width': bb_width,
+            'bb_width_prev': bb_width_prev,
+            'bb_expanding': bb_change > 0.5,
+            # RSI
+            'rsi': _rsi(close, 14),
+            # Volume
+            'volume_usdt': df['volume'].to_numpy() * close
+        }
+        
+        # Períodos de aquecimento ficam zerados (equivalente ao fillna(0))
+        for values in out.values():
+            if values.dtype.kind == 'f':
+                values[np.isnan(values)] = 0
+        
+        # Anexa as colunas novas sem duplicar o OHLCV original (indicadores antigos são substituídos)
+        df = df.drop(columns=list(out), errors='ignore')
+        if df.isna().values.any():
+            df = df.fillna(0)
+        return pd.concat([df, pd.DataFrame(out, index=df.index)], axis=1, copy=False)
+    
+    def _alloc_trades(self, capacity):
+        """(Re)aloca os arrays de trades preservando os já registrados"""
+        n = getattr(self, '_ntrades', 0)
+        arrays = {
+            '_side': np.int8, '_reason': np.int8,
+            '_entry': np.float64, '_exit': np.float64,
+            '_pnl_usdt': np.float64, '_pnl_pct': np.float64,
+            '_t_entry': 'datetime64[ns]', '_t_exit': 'datetime64[ns]'
+        }
+        for name, dtype in arrays.items():
+            new = np.empty(capacity, dtype=dtype)
+            if n:
+                new[:n] = getattr(self, name)[:n]
+            setattr(self, name, new)
+        self._ntrades = n
+    
+    def _store_trades(self, side, reason, entry, exit_, pnl_usdt, pnl_pct, t_entry, t_exit):
+        """Grava um lote de trades fechados nos arrays a partir do cursor"""
+        start, count = self._ntrades, len(side)
+        if start + count > len(self._side):
+            self._alloc_trades(max(2 * len(self._side), start + count))
+        
+        end = start + count
+        self._side[start:end] = side
+        self._reason[start:end] = reason
+        self._entry[start:end] = entry
+        self._exit[start:end] = exit_
+        self._pnl_usdt[start:end] = pnl_usdt
+        self._pnl_pct[start:end] = pnl_pct
+        self._t_entry[start:end] = t_entry
+        self._t_exit[start:end] = t_exit
+        self._ntrades = end
+    
+    def _trade_times(self, values):
+        times = pd.DatetimeIndex(values)
+        return times.tz_localize('UTC').tz_convert(self._tz) if self._tz else times
+    
+    def trades_frame(self):
+        """DataFrame dos trades fechados, montado de uma vez a partir dos arrays"""
+        n = self._ntrades
+        entry_time = self._trade_times(self._t_entry[:n])
+        exit_time = self._trade_times(self._t_exit[:n])
+        return pd.DataFrame({
+            'side': np.where(self._side[:n] == SIDE_LONG, 'LONG', 'SHORT'),
+            'entry': self._entry[:n],
+            'exit': self._exit[:n],
+            'pnl_usdt': self._pnl_usdt[:n],
+            'pnl_pct': self._pnl_pct[:n],
+            'reason': np.where(self._reason[:n] == REASON_STOP_LOSS, 'STOP_LOSS', 'TAKE_PROFIT'),
+            'entry_time': entry_time.map(pd.Timestamp.isoformat),
+            'exit_time': exit_time.map(pd.Timestamp.isoformat),
+            'duration_min': (exit_time - entry_time).total_seconds() / 60
+        })
+    
+    @property
+    def trades(self):
+        """Trades fechados como lista de dicionários"""
+        return self.trades_frame().to_dict('records')
     
     def is_trading_hour(self, timestamp):
         """Verifica horário de trading"""
-        hour = timestamp.hour
-        return any(start <= hour < end for start, end in self.trading_hours)
+        return bool(self._hours_mask[timestamp.hour])
     
     def run(self, df, days_to_test=None, simulate_real_time=False):
-        """Executa forward testing"""
+        """
+        Executa forward testing
+        simulate_real_time é mantido por compatibilidade e não adiciona mais atraso
+        """
         if days_to_test and len(df) > 100:
             cutoff = df['timestamp'].max() - pd.Timedelta(days=days_to_test)
             df = df[df['timestamp'] >= cutoff].copy()
         
         df = self.calculate_indicators(df)
-        position = None
-        entry_price = None
-        entry_time = None
+        
+        # Colunas extraídas uma única vez como arrays NumPy
+        timestamps = df['timestamp'].reset_index(drop=True)
+        close = df['close'].to_numpy()
+        ema6 = df['ema6'].to_numpy()
+        ema7 = df['ema7'].to_numpy()
+        ema21 = df['ema21'].to_numpy()
+        volume_usdt = df['volume_usdt'].to_numpy()
+        bb_expanding = df['bb_expanding'].to_numpy(dtype=np.bool_)
+        macd_bullish = df['macd_bullish'].to_numpy(dtype=np.bool_)
+        macd_bearish = df['macd_bearish'].to_numpy(dtype=np.bool_)
+        hours = timestamps.dt.hour.to_numpy()
+        
+        # Filtros combinados em uma única máscara
+        ok = self._hours_mask[hours] & (volume_usdt >= self.volume_min) & bb_expanding
         
         # Capital inicial
-        initial_price = df['close'].iloc[0]
+        initial_price = close[0]
         capital = self.position_size * initial_price
-        self.equity_curve = [(df['timestamp'].iloc[0].isoformat(), capital)]
+        self.equity_curve = [(timestamps.iloc[0].isoformat(), capital)]
         
         print(f"🔬 Iniciando forward testing com {self.position_size} SOL...")
         
-        for i in range(30, len(df)):
-            row = df.iloc[i]
-            ts = row['timestamp']
-            price = row['close']
-            
-            # Filtros
-            if not self.is_trading_hour(ts):
-                continue
-            if row['volume_usdt'] < self.volume_min:
-                continue
-            if not row['bb_expanding']:
-                continue
-            
-            # Entrada
-            if position is None:
-                # LONG
-                if row['macd_bullish'] and price > row['ema6'] and row['ema7'] > row['ema21']:
-                    position = 'LONG'
-                    entry_price = price * (1 + self.fees)
-                    entry_time = ts
-                    
-                    if self.enable_telegram and self.telegram:
-                        self.telegram.send_trade_signal('LONG', price, row, capital)
-                    
-                    if simulate_real_time:
-                        time.sleep(0.1)  # Simula delay real
-                    continue
-                
-                # SHORT
-                if row['macd_bearish'] and price < row['ema6'] and row['ema7'] < row['ema21']:
-                    position = 'SHORT'
-                    entry_price = price * (1 - self.fees)
-                    entry_time = ts
-                    
-                    if self.enable_telegram and self.telegram:
-                        self.telegram.send_trade_signal('SHORT', price, row, capital)
-                    
-                    if simulate_real_time:
-                        time.sleep(0.1)
-                    continue
-            
-            # Saída
-            if position:
-                sl = entry_price * (1 - self.stop_loss_pct) if position == 'LONG' else entry_price * (1 + self.stop_loss_pct)
-                tp = entry_price * (1 + self.take_profit_pct) if position == 'LONG' else entry_price * (1 - self.take_profit_pct)
-                
-                exit_trade = False
-                exit_price = None
-                reason = ""
-                
-                if position == 'LONG':
-                    if price <= sl:
-                        exit_trade = True
-                        exit_price = price * (1 - self.fees)
-                        reason = 'STOP_LOSS'
-                    elif price >= tp:
-                        exit_trade = True
-                        exit_price = price * (1 - self.fees)
-                        reason = 'TAKE_PROFIT'
-                else:
-                    if price >= sl:
-                        exit_trade = True
-                        exit_price = price * (1 + self.fees)
-                        reason = 'STOP_LOSS'
-                    elif price <= tp:
-                        exit_trade = True
-                        exit_price = price * (1 + self.fees)
-                        reason = 'TAKE_PROFIT'
+        entry_idx, exit_idx, side_code, entry_price, exit_price, reason_code = _run_loop(
+            close, ema6, ema7, ema21, ok, macd_bullish, macd_bearish,
+            self.fees, self.stop_loss_pct, self.take_profit_pct
+        )
+        
+        # Reconstrói trades fechados e curva de capital
+        closed = exit_idx >= 0
+        side = np.where(side_code == SIDE_LONG, 'LONG', 'SHORT')
+        reason = np.where(reason_code == REASON_STOP_LOSS, 'STOP_LOSS', 'TAKE_PROFIT')
+        pnl_usdt = side_code[closed] * (exit_price[closed] - entry_price[closed]) * self.position_size
+        pnl_pct = (pnl_usdt / (entry_price[closed] * self.position_size)) * 100
+        equity = np.cumsum(np.concatenate(([capital], pnl_usdt)))
+        
+        times = timestamps.to_numpy(dtype='datetime64[ns]')
+        self._tz = timestamps.dt.tz
+        if len(self._side) == 0:
+            self._alloc_trades(len(df) // 2)
+        self._store_trades(side_code[closed], reason_code[closed], entry_price[closed],
+                           exit_price[closed], pnl_usdt, pnl_pct,
+                           times[entry_idx[closed]], times[exit_idx[closed]])
+        
+        exit_iso = timestamps.iloc[exit_idx[closed]].map(pd.Timestamp.isoformat)
+        self.equity_curve.extend(zip(exit_iso, equity[1:]))
+        capital = equity[-1]
+        
+        # Notificações na ordem em que os eventos ocorreram (o ritmo fica no TelegramNotifier)
+        if self.enable_telegram and self.telegram and self.telegram._enabled:
+            entry_rows = df.iloc[entry_idx].to_dict('records')
+            for k in range(len(entry_idx)):
+                self.telegram.send_trade_signal(side[k], close[entry_idx[k]],
+                                                entry_rows[k], equity[k])
                 
-                if exit_trade:
-                    pnl_usdt = (exit_price - entry_price) * self.position_size if position == 'LONG' else (entry_price - exit_price) * self.position_size
-                    pnl_pct = (pnl_usdt / (entry_price * self.position_size)) * 100
-                    capital += pnl_usdt
-                    
-                    self.trades.append({
-                        'side': position,
-                        'entry': entry_price,
-                        'exit': exit_price,
-                        'pnl_usdt': pnl_usdt,
-                        'pnl_pct': pnl_pct,
-                        'reason': reason,
-                        'entry_time': entry_time.isoformat(),
-                        'exit_time': ts.isoformat(),
-                        'duration_min': (ts - entry_time).total_seconds() / 60
-                    })
-                    
-                    self.equity_curve.append((ts.isoformat(), capital))
-                    
-                    if self.enable_telegram and self.telegram:
-                        self.telegram.send_trade_close(position, pnl_pct, reason, capital)
-                    
-                    position = None
+                if closed[k]:
+                    self.telegram.send_trade_close(side[k], pnl_pct[k],
+                                                   reason[k], equity[k + 1])
         
         return self.generate_report(capital, initial_price)
     
     def generate_report(self, final_capital, initial_price):
         """Gera relatório completo"""
-        if not self.trades:
+        if self._ntrades == 0:
             return {'error': 'Nenhum trade executado'}
         
-        df_trades = pd.DataFrame(self.trades)
-        wins = len(df_trades[df_trades['pnl_pct'] > 0])
-        losses = len(df_trades[df_trades['pnl_pct'] <= 0])
+        df_trades = self.trades_frame()
+        pnl = self._pnl_pct[:self._ntrades]
+        win_mask = pnl > 0
+        wins = int(win_mask.sum())
+        losses = len(pnl) - wins
+        win_sum = pnl[win_mask].sum()
+        loss_sum = pnl[~win_mask].sum()
         
-        equity = pd.Series([e[1] for e in self.equity_curve])
-        rolling_max = equity.expanding().max()
+        equity = np.fromiter((e[1] for e in self.equity_curve), dtype=np.float64,
+                             count=len(self.equity_curve))
+        rolling_max = np.maximum.accumulate(equity)
         drawdown = (equity - rolling_max) / rolling_max * 100
         
+        initial_capital = self.position_size * initial_price
+        
         return {
-            'trades': len(df_trades),
+            'trades': len(pnl),
             'wins': wins,
             'losses': losses,
-            'win_rate': (wins / len(df_trades) * 100) if len(df_trades) > 0 else 0,
-            'avg_win': df_trades[df_trades['pnl_pct'] > 0]['pnl_pct'].mean() if wins > 0 else 0,
-            'avg_loss': df_trades[df_trades['pnl_pct'] <= 0]['pnl_pct'].mean() if losses > 0 else 0,
-            'profit_factor': abs(df_trades[df_trades['pnl_pct'] > 0]['pnl_pct'].sum() / 
-                               df_trades[df_trades['pnl_pct'] <= 0]['pnl_pct'].sum()) if losses > 0 else 0,
-            'expectancy': df_trades['pnl_pct'].mean(),
-            'total_return_pct': ((final_capital - (self.position_size * initial_price)) / 
-                               (self.position_size * initial_price)) * 100,
+            'win_rate': wins / len(pnl) * 100,
+            'avg_win': win_sum / wins if wins > 0 else 0,
+            'avg_loss': loss_sum / losses if losses > 0 else 0,
+            'profit_factor': abs(win_sum / loss_sum) if loss_sum else 0,
+            'expectancy': pnl.mean(),
+            'total_return_pct': ((final_capital - initial_capital) / initial_capital) * 100,
             'max_drawdown_pct': drawdown.min(),
             'final_capital': final_capital,
-            'initial_capital': self.position_size * initial_price,
+            'initial_capital': initial_capital,
             'trades_df': df_trades,
             'equity_curve': self.equity_curve
         }
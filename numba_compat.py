@@ -0,0 +1,14 @@
+#!/usr/bin/env python3
+"""
+COMPATIBILIDADE NUMBA
+Expõe o decorador njit; sem numba instalado, as funções rodam em Python puro
+"""
+
+try:
+    from numba import njit
+except ImportError:  # numba é opcional
+    def njit(*args, **kwargs):
+        """Decorador no-op usado quando numba não está disponível"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
@@ -4,121 +4,683 @@ NOTIFICADOR TELEGRAM PARA FORWARD TESTING
 Envia alertas de trades, divergências e relatórios
 """
 
-import requests
+import asyncio
+import atexit
+import functools
+import http.client
 import json
-from datetime import datetime
+import random
+import threading
+import time
+import weakref
+from collections import deque
 
-class TelegramNotifier:
+try:
+    import orjson
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:  # orjson é opcional
+    orjson = None
+    _loads = json.loads
+    
+    def _dumps(obj):
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode()
+
+try:
+    import aiohttp
+except ImportError:  # aiohttp é opcional (só para AsyncTelegramNotifier)
+    aiohttp = None
+
+API_HOST = 'api.telegram.org'
+
+# Prioridades da fila (também a categoria usada no agrupamento):
+# em caso de fila cheia descarta primeiro a menor
+PRIORITY_REPORT = 0
+PRIORITY_DIVERGENCE = 1
+PRIORITY_TRADE = 2
+
+# Separador das mensagens, compartilhado pelos templates
+_SEP = "━━━━━━━━━━━━━━━━━━━━"
+
+# Emojis de lado e resultado, compartilhados entre as mensagens
+_EMO_LONG = "🟢"
+_EMO_SHORT = "🔴"
+_EMO_WIN = "✅"
+_EMO_LOSS = "❌"
+
+# Escape dos campos de texto livre (parse_mode HTML)
+_HTML_ESCAPE = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;'})
+
+# Relatório de backtest: depende só das estatísticas, então o texto é memoizado
+_BACKTEST_TMPL = (
+    "📊 <b>RELATÓRIO FORWARD TESTING - SOL/USDT</b>\n"
+    f"{_SEP}\n"
+    "📈 Resultados:\n"
+    "   • Trades: {total_trades}\n"
+    "   • Win Rate: {win_rate:.1f}%\n"
+    "   • Profit Factor: {profit_factor:.2f}\n"
+    "   • Expectativa: {expectancy:+.2f}%\n"
+    "   • Retorno Total: {total_return:+.2f}%\n"
+    "   • Max Drawdown: {max_drawdown:.2f}%\n\n"
+    "⚠️  Divergências:\n"
+    "   • Total: {divergence_count}\n"
+    "   • Taxa: {divergence_rate:.1f}%\n"
+    f"{_SEP}"
+)
+
+@functools.lru_cache(maxsize=64)
+def _format_backtest(total_trades, win_rate, profit_factor, expectancy, total_return,
+                     max_drawdown, divergence_count, divergence_rate):
+    return _BACKTEST_TMPL.format_map(locals())
+
+def _hms(t=None, _localtime=time.localtime):
+    """Horário local HH:MM:SS (de t ou de agora) sem passar por datetime/strftime"""
+    tm = _localtime(t)
+    return f"{tm.tm_hour:02d}:{tm.tm_min:02d}:{tm.tm_sec:02d}"
+
+# Notificadores ativos, esvaziados na saída do programa
+_notifiers = weakref.WeakSet()
+SHUTDOWN_TIMEOUT = 10.0  # segundos (total) para enviar os alertas pendentes na saída
+
+@atexit.register
+def _shutdown_notifiers():
+    deadline = time.monotonic() + SHUTDOWN_TIMEOUT
+    for notifier in list(_notifiers):
+        notifier.shutdown(timeout=max(0.0, deadline - time.monotonic()))
+
+class _RateLimiter:
+    """
+    Token bucket global + janela por chat, compartilhados por todos os notificadores do mesmo bot
+    A vaga é reservada sob o lock e a espera acontece fora dele
+    """
+    
+    def __init__(self, rate, chat_limit, chat_window):
+        self.max_rate = rate
+        self.chat_limit = chat_limit
+        self.chat_window = chat_window
+        self.rate = rate
+        self._tokens = rate
+        self._last_refill = time.monotonic()
+        self._chat_sends = {}
+        self._lock = threading.Lock()
+    
+    def wait(self, chat_id):
+        """Aguarda um token do bucket e espaço na janela do chat"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.rate, self._tokens + (now - self._last_refill) * self.rate)
+            self._last_refill = now
+            self._tokens -= 1
+            at = now + max(0.0, -self._tokens) / self.rate  # saldo negativo: tokens já reservados
+            
+            sends = self._chat_sends.setdefault(chat_id, deque())
+            while sends and now - sends[0] >= self.chat_window:
+                sends.popleft()
+            if len(sends) >= self.chat_limit:
+                at = max(at, sends[-self.chat_limit] + self.chat_window)
+            sends.append(at)
+        
+        if at > now:
+            time.sleep(at - now)
+    
+    def increase(self, step):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + step)
+    
+    def decrease(self, factor, minimum):
+        with self._lock:
+            self.rate = max(minimum, self.rate * factor)
+            self._tokens = min(self._tokens, 0.0)
+
+# Limitadores por token do bot: os limites da API valem por bot, não por instância
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+def _limiter_for(token, rate, chat_limit, chat_window):
+    """Limitador compartilhado do bot (criado com os parâmetros do primeiro notificador)"""
+    with _limiters_lock:
+        limiter = _limiters.get(token)
+        if limiter is None:
+            limiter = _limiters[token] = _RateLimiter(rate, chat_limit, chat_window)
+        return limiter
+
+class _TelegramBase:
+    """Credenciais, templates e formatação compartilhados pelos notificadores"""
+    
+    # Retentativas com backoff exponencial + jitter
+    MAX_ATTEMPTS = 8
+    RETRY_STATUS = frozenset({429, 500, 502, 503, 504})
+    
+    # Templates das mensagens, preenchidos com format_map
+    _TRADE_SIGNAL_TMPL = (
+        "{emoji} <b>SINAL {direction} - FORWARD TESTING</b>\n"
+        f"{_SEP}\n"
+        "💰 Preço: ${price:.4f}\n"
+        "⏰ Horário: {time}\n"
+        "📊 Capital: ${capital:.2f}\n\n"
+        f"{_EMO_WIN} Condições:\n"
+        "   • MACD: {macd}\n"
+        "   • EMA6: {ema6}\n"
+        "   • Bollinger: Expansão\n"
+        "   • Volume: {volume:.0f} USDT\n"
+        f"{_SEP}"
+    )
+    
+    _TRADE_CLOSE_TMPL = (
+        "{emoji} <b>FECHAMENTO - {performance} {abs_pnl:.2f}%</b>\n"
+        f"{_SEP}\n"
+        "📊 Motivo: {reason}\n"
+        "💰 PNL: {pnl:+.2f}%\n"
+        "📈 Capital: ${capital:.2f}\n"
+        f"{_SEP}"
+    )
+    
+    _DIVERGENCE_TMPL = (
+        "{emoji} <b>DIVERGÊNCIA DETECTADA</b>\n"
+        f"{_SEP}\n"
+        "📉 Tipo: {type}\n"
+        "📊 Indicador: {indicator}\n"
+        "💰 Preço: ${price:.4f}\n"
+        "⏰ Horário: {time}\n\n"
+        "🔍 Detalhes:\n"
+        "   • {price_action}\n"
+        "   • {indicator_action}\n"
+        f"{_SEP}"
+    )
+    
+    # Campos que dependem só do lado do trade / do resultado
+    _SIDE_FIELDS = {
+        'LONG': {'emoji': _EMO_LONG, 'direction': "COMPRA", 'macd': 'Bullish', 'ema6': 'Preço acima'},
+        'SHORT': {'emoji': _EMO_SHORT, 'direction': "VENDA", 'macd': 'Bearish', 'ema6': 'Preço abaixo'}
+    }
+    _PNL_FIELDS = {
+        True: {'emoji': _EMO_WIN, 'performance': "Lucro"},
+        False: {'emoji': _EMO_LOSS, 'performance': "Prejuízo"}
+    }
+    _REASON_TEXT = {
+        'STOP_LOSS': 'Stop-Loss',
+        'TAKE_PROFIT': 'Take-Profit',
+        'TRAILING_STOP': 'Trailing Stop'
+    }
+    
+    # Valores usados quando a estatística não veio no resultado
+    _BACKTEST_DEFAULTS = {
+        'total_trades': 0,
+        'win_rate': 0.0,
+        'profit_factor': 0.0,
+        'expectancy': 0.0,
+        'total_return': 0.0,
+        'max_drawdown': 0.0,
+        'divergence_count': 0,
+        'divergence_rate': 0.0
+    }
+    
+    # Métodos públicos que ficam no-op enquanto não há credenciais
+    _SENDERS = ('send_trade_signal', 'send_trade_close', 'send_divergence_alert', 'send_backtest_report')
+    
     def __init__(self):
         self.token = None
         self.chat_id = None
         self.base_url = None
+        self._path_prefix = None
+        self._send_path = None
+        self._payload_prefix = None
+        self._enabled = False
     
     def set_credentials(self, token, chat_id):
         """Configura credenciais Telegram"""
         self.token = token
         self.chat_id = chat_id
-        self.base_url = f"https://api.telegram.org/bot{token}"
+        self.base_url = f"https://{API_HOST}/bot{token}"
+        self._path_prefix = f"/bot{token}"
+        self._send_path = f"{self._path_prefix}/sendMessage"
+        
+        # Parte invariante do corpo JSON, sem o '}' final: só o texto é serializado por envio
+        self._payload_prefix = _dumps({'chat_id': chat_id, 'parse_mode': 'HTML'})[:-1]
+        
+        # Com credenciais, os métodos públicos passam a apontar para as implementações reais
+        self._enabled = bool(token and chat_id)
+        for name in self._SENDERS:
+            if self._enabled:
+                setattr(self, name, getattr(self, f'_{name}_impl'))
+            else:
+                self.__dict__.pop(name, None)
+    
+    def _encode(self, text, parse_mode):
+        """Corpo JSON de sendMessage, reaproveitando o prefixo pré-serializado"""
+        if parse_mode is None:
+            return _dumps({'chat_id': self.chat_id, 'text': text})
+        if parse_mode != 'HTML':
+            return _dumps({'chat_id': self.chat_id, 'text': text, 'parse_mode': parse_mode})
+        return self._payload_prefix + b',"text":' + _dumps(text) + b'}'
+    
+    @staticmethod
+    def _backoff(attempt):
+        """Atraso exponencial limitado a 60s com jitter"""
+        return min(60.0, (2 ** attempt) * 0.5) + random.uniform(0, 0.5)
+    
+    # Formatadores (no TelegramNotifier rodam na thread consumidora)
+    def _format_trade_signal(self, side, price, volume, capital, ts):
+        return self._TRADE_SIGNAL_TMPL.format_map({
+            **self._SIDE_FIELDS.get(side, self._SIDE_FIELDS['SHORT']),
+            'price': price,
+            'time': _hms(ts),
+            'capital': capital,
+            'volume': volume,
+        })
+    
+    def _format_trade_close(self, side, pnl_pct, reason, capital):
+        return self._TRADE_CLOSE_TMPL.format_map({
+            **self._PNL_FIELDS[pnl_pct > 0],
+            'abs_pnl': abs(pnl_pct),
+            'reason': self._REASON_TEXT.get(reason) or str(reason).translate(_HTML_ESCAPE),
+            'pnl': pnl_pct,
+            'capital': capital,
+        })
+    
+    def _format_divergence(self, severity, div_type, indicator, price, price_action, indicator_action, ts):
+        return self._DIVERGENCE_TMPL.format_map({
+            'emoji': "⚠️" if severity == 'MEDIUM' else "🚨",
+            'type': div_type.translate(_HTML_ESCAPE),
+            'indicator': indicator.translate(_HTML_ESCAPE),
+            'price': price,
+            'time': _hms(ts),
+            'price_action': price_action.translate(_HTML_ESCAPE),
+            'indicator_action': indicator_action.translate(_HTML_ESCAPE),
+        })
+    
+    def _backtest_values(self, results):
+        """Estatísticas (com defaults) como argumentos nomeados de _format_backtest"""
+        stats = results.get('statistics', {})
+        return {key: stats.get(key, default) for key, default in self._BACKTEST_DEFAULTS.items()}
+    
+    def _format_report(self, values):
+        return _format_backtest(**values)
+    
+    _FORMATTERS = {
+        'TRADE_SIGNAL': _format_trade_signal,
+        'TRADE_CLOSE': _format_trade_close,
+        'DIVERGENCE': _format_divergence,
+        'BACKTEST': _format_report
+    }
+
+
+class TelegramNotifier(_TelegramBase):
+    MAX_QUEUE = 200
+    IDLE_TIMEOUT = 30.0
     
-    def send_message(self, text, parse_mode='Markdown'):
-        """Envia mensagem básica"""
+    # Agrupamento em rajadas: mensagens da mesma categoria viram um único sendMessage
+    BATCH_WAIT = 0.5
+    BATCH_CHARS = 4000
+    BATCH_JOIN = "\n\n"
+    
+    _HEADERS = {'Content-Type': 'application/json', 'Connection': 'keep-alive'}
+    
+    # Adaptive token bucket: sobe a taxa aos poucos, corta pela metade em 429
+    RATE_MIN = 1.0
+    RATE_INCREASE = 1.0
+    RATE_DECREASE = 0.5
+    
+    def __init__(self, rate=30.0, chat_limit=20, chat_window=60.0):
+        super().__init__()
+        
+        # Token bucket global (msg/s, até rate) + janela por chat (chat_limit msgs a cada chat_window s)
+        # O estado fica em um _RateLimiter compartilhado por token, definido em set_credentials
+        self.rate = rate
+        self.chat_limit = chat_limit
+        self.chat_window = chat_window
+        self._limiter = None
+        
+        # Conexão HTTPS persistente (keep-alive), aberta no primeiro envio
+        self._conn = None
+        self._conn_lock = threading.Lock()
+        
+        # Fila limitada consumida por uma única thread (iniciada sob demanda)
+        self._queue = deque(maxlen=self.MAX_QUEUE)
+        self._cond = threading.Condition()
+        self._consumer = None
+        self._closed = False
+        _notifiers.add(self)
+    
+    def set_credentials(self, token, chat_id):
+        super().set_credentials(token, chat_id)
+        self._limiter = _limiter_for(token, self.rate, self.chat_limit, self.chat_window)
+    
+    def shutdown(self, wait=True, timeout=None):
+        """Encerra o consumidor (wait=True aguarda o envio das pendentes, até timeout segundos)"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            consumer = self._consumer
+        if wait and consumer is not None:
+            consumer.join(timeout)
+    
+    def close(self):
+        """Fecha a conexão HTTPS"""
+        with self._conn_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+    
+    def __del__(self):
+        conn = getattr(self, '_conn', None)
+        if conn is not None:
+            conn.close()
+    
+    def send_message(self, text, parse_mode=None, priority=PRIORITY_TRADE):
+        """Enfileira mensagem básica para envio em background (texto puro, salvo parse_mode)"""
         if not self.token or not self.chat_id:
             return
+        self._enqueue(priority, 'TEXT', (text, parse_mode))
+    
+    def _enqueue(self, priority, kind, args):
+        """Enfileira um registro (kind, args); a formatação fica para a thread consumidora"""
+        with self._cond:
+            if self._closed:
+                return
+            
+            # Fila cheia: descarta a mensagem mais antiga de menor prioridade
+            if len(self._queue) >= self.MAX_QUEUE:
+                lowest = min(item[0] for item in self._queue)
+                if priority < lowest:
+                    return
+                for item in self._queue:
+                    if item[0] == lowest:
+                        self._queue.remove(item)
+                        break
+            
+            self._queue.append((priority, kind, args))
+            if self._consumer is None:
+                self._consumer = threading.Thread(target=self._consume, name='tg-notify', daemon=True)
+                self._consumer.start()
+            self._cond.notify()
+    
+    def _consume(self):
+        """Loop da thread consumidora; encerra após IDLE_TIMEOUT sem mensagens"""
+        while True:
+            with self._cond:
+                if not self._queue and not self._closed:
+                    self._cond.wait(self.IDLE_TIMEOUT)
+                if not self._queue:
+                    self._consumer = None
+                    return
+            
+            self._render_queue()
+            with self._cond:
+                grow = len(self._queue) > 1 and self._batch_can_grow()
+            
+            # Rajada em andamento: espera acumular enquanto o lote ainda pode crescer
+            if grow:
+                deadline = time.monotonic() + self.BATCH_WAIT
+                while True:
+                    with self._cond:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0 or self._closed:
+                            break
+                        self._cond.wait(remaining)
+                    self._render_queue()
+                    # Chegou mensagem de outra categoria ou o lote encheu: envia já
+                    with self._cond:
+                        if not self._batch_can_grow():
+                            break
+            
+            with self._cond:
+                batch = self._pop_batch()
+            if batch is None:
+                continue
+            
+            text, parse_mode = batch
+            self._wait_rate_limit(self.chat_id)
+            self._do_send(self._send_path, self._encode(text, parse_mode))
+    
+    def _render_queue(self):
+        """Formata, fora do lock, os registros da fila ainda não formatados"""
+        with self._cond:
+            raw = [item for item in self._queue if item[1] != 'TEXT']
+        if not raw:
+            return
         
-        url = f"{self.base_url}/sendMessage"
-        data = {
-            'chat_id': self.chat_id,
-            'text': text,
-            'parse_mode': parse_mode
-        }
+        rendered = {}
+        for item in raw:
+            priority, kind, args = item
+            try:
+                rendered[id(item)] = (priority, 'TEXT', (self._FORMATTERS[kind](self, *args), 'HTML'))
+            except Exception as e:
+                # Registro inválido é descartado sem derrubar a thread consumidora
+                print(f"Erro ao formatar mensagem Telegram ({kind}): {e}")
+                rendered[id(item)] = None
         
+        # Devolve à fila só o que não foi descartado enquanto formatava
+        with self._cond:
+            kept = [rendered.get(id(item), item) for item in self._queue]
+            self._queue.clear()
+            self._queue.extend(item for item in kept if item is not None)
+    
+    def _batch_can_grow(self):
+        """True se toda a fila é da mesma categoria do início e ainda cabe em uma mensagem"""
+        if not self._queue or self._queue[0][1] != 'TEXT':
+            return False
+        priority, _, (_, parse_mode) = self._queue[0]
+        size = -len(self.BATCH_JOIN)
+        for item_priority, kind, args in self._queue:
+            if kind == 'TEXT':
+                text, mode = args
+                size += len(self.BATCH_JOIN) + len(text)
+            else:
+                mode = 'HTML'  # ainda não formatado: o tamanho é conferido na próxima passada
+            if item_priority != priority or mode != parse_mode or size >= self.BATCH_CHARS:
+                return False
+        return True
+    
+    def _pop_batch(self):
+        """Retira do início da fila as mensagens formatadas consecutivas da mesma categoria que cabem em uma"""
+        if not self._queue or self._queue[0][1] != 'TEXT':
+            return None
+        priority, _, (text, parse_mode) = self._queue.popleft()
+        parts = [text]
+        size = len(text)
+        while self._queue and self._queue[0][1] == 'TEXT':
+            next_priority, _, (next_text, next_mode) = self._queue[0]
+            size += len(self.BATCH_JOIN) + len(next_text)
+            if next_priority != priority or next_mode != parse_mode or size > self.BATCH_CHARS:
+                break
+            self._queue.popleft()
+            parts.append(next_text)
+        return self.BATCH_JOIN.join(parts), parse_mode
+    
+    def _wait_rate_limit(self, chat_id):
+        """Aguarda um token do bucket global e espaço na janela do chat"""
+        self._limiter.wait(chat_id)
+    
+    def _increase_rate(self):
+        self._limiter.increase(self.RATE_INCREASE)
+    
+    def _decrease_rate(self):
+        self._limiter.decrease(self.RATE_DECREASE, self.RATE_MIN)
+    
+    def _post(self, path, body):
+        """POST na conexão persistente; retorna (status, resposta JSON)"""
+        with self._conn_lock:
+            if self._conn is None:
+                self._conn = http.client.HTTPSConnection(API_HOST, timeout=10)
+            try:
+                self._conn.request('POST', path, body=body, headers=self._HEADERS)
+                response = self._conn.getresponse()
+                payload = response.read()
+            except (http.client.HTTPException, OSError):
+                # RemoteDisconnected/BadStatusLine/timeout: reconecta no próximo envio
+                self._conn.close()
+                raise
+        try:
+            return response.status, _loads(payload)
+        except ValueError:  # corpo não-JSON (ex.: página de erro de proxy)
+            return response.status, {}
+    
+    def _do_send(self, path, body):
+        """POST bloqueante (corpo JSON já serializado) executado pela thread consumidora, com retentativas"""
+        error = None
         try:
-            response = requests.post(url, json=data, timeout=10)
-            return response.json()
+            for attempt in range(self.MAX_ATTEMPTS):
+                try:
+                    status, payload = self._post(path, body)
+                except (http.client.HTTPException, OSError) as e:
+                    error = e
+                    delay = self._backoff(attempt)
+                else:
+                    if status not in self.RETRY_STATUS:
+                        if status >= 400:
+                            # Erro definitivo (ex.: 400 "can't parse entities"): não adianta repetir
+                            print(f"Erro ao enviar Telegram: HTTP {status} - {payload.get('description')}")
+                            return None
+                        self._increase_rate()
+                        return payload
+                    
+                    error = f"HTTP {status}"
+                    delay = self._backoff(attempt)
+                    if status == 429:
+                        # Rate limit do Telegram: pausa todos os envios pelo tempo pedido
+                        self._decrease_rate()
+                        delay = payload.get('parameters', {}).get('retry_after', delay)
+                
+                if attempt < self.MAX_ATTEMPTS - 1:
+                    time.sleep(delay)
         except Exception as e:
-            print(f"Erro ao enviar Telegram: {e}")
-            return None
+            error = e
+        
+        print(f"Erro ao enviar Telegram: {error}")
+        return None
     
+    # No-ops até set_credentials; para não montar argumentos à toa use
+    # `if notifier._enabled:` antes de chamar
     def send_trade_signal(self, side, price, indicators, capital):
         """Envia alerta de sinal de trade"""
-        emoji = "🟢" if side == "LONG" else "🔴"
-        direction = "COMPRA" if side == "LONG" else "VENDA"
-        
-        message = (
-            f"{emoji} *SINAL {direction} - FORWARD TESTING*\n"
-            f"━━━━━━━━━━━━━━━━━━━━\n"
-            f"💰 Preço: ${price:.4f}\n"
-            f"⏰ Horário: {datetime.now().strftime('%H:%M:%S')}\n"
-            f"📊 Capital: ${capital:.2f}\n\n"
-            f"✅ Condições:\n"
-            f"   • MACD: {'Bullish' if side == 'LONG' else 'Bearish'}\n"
-            f"   • EMA6: {'Preço acima' if side == 'LONG' else 'Preço abaixo'}\n"
-            f"   • Bollinger: Expansão\n"
-            f"   • Volume: {indicators['volume_usdt']:.0f} USDT\n"
-            f"━━━━━━━━━━━━━━━━━━━━"
-        )
-        
-        return self.send_message(message)
     
     def send_trade_close(self, side, pnl_pct, reason, capital):
         """Envia alerta de fechamento de trade"""
-        emoji = "✅" if pnl_pct > 0 else "❌"
-        performance = "Lucro" if pnl_pct > 0 else "Prejuízo"
-        
-        reason_text = {
-            'STOP_LOSS': 'Stop-Loss',
-            'TAKE_PROFIT': 'Take-Profit',
-            'TRAILING_STOP': 'Trailing Stop'
-        }.get(reason, reason)
-        
-        message = (
-            f"{emoji} *FECHAMENTO - {performance} {abs(pnl_pct):.2f}%*\n"
-            f"━━━━━━━━━━━━━━━━━━━━\n"
-            f"📊 Motivo: {reason_text}\n"
-            f"💰 PNL: {pnl_pct:+.2f}%\n"
-            f"📈 Capital: ${capital:.2f}\n"
-            f"━━━━━━━━━━━━━━━━━━━━"
-        )
-        
-        return self.send_message(message)
     
     def send_divergence_alert(self, divergence):
         """Envia alerta de divergência detectada"""
-        emoji = "⚠️" if divergence['severity'] == 'MEDIUM' else "🚨"
-        
-        message = (
-            f"{emoji} *DIVERGÊNCIA DETECTADA*\n"
-            f"━━━━━━━━━━━━━━━━━━━━\n"
-            f"📉 Tipo: {divergence['type']}\n"
-            f"📊 Indicador: {divergence['indicator']}\n"
-            f"💰 Preço: ${divergence['price']:.4f}\n"
-            f"⏰ Horário: {datetime.now().strftime('%H:%M:%S')}\n\n"
-            f"🔍 Detalhes:\n"
-            f"   • {divergence['price_action']}\n"
-            f"   • {divergence['indicator_action']}\n"
-            f"━━━━━━━━━━━━━━━━━━━━"
-        )
-        
-        return self.send_message(message)
     
     def send_backtest_report(self, results):
         """Envia relatório completo de backtest"""
-        stats = results.get('statistics', {})
-        
-        message = (
-            f"📊 *RELATÓRIO FORWARD TESTING - SOL/USDT*\n"
-            f"━━━━━━━━━━━━━━━━━━━━\n"
-            f"📈 Resultados:\n"
-            f"   • Trades: {stats.get('total_trades', 0)}\n"
-            f"   • Win Rate: {stats.get('win_rate', 0):.1f}%\n"
-            f"   • Profit Factor: {stats.get('profit_factor', 0):.2f}\n"
-            f"   • Expectativa: {stats.get('expectancy', 0):+.2f}%\n"
-            f"   • Retorno Total: {stats.get('total_return', 0):+.2f}%\n"
-            f"   • Max Drawdown: {stats.get('max_drawdown', 0):.2f}%\n\n"
-            f"⚠️  Divergências:\n"
-            f"   • Total: {stats.get('divergence_count', 0)}\n"
-            f"   • Taxa: {stats.get('divergence_rate', 0):.1f}%\n"
-            f"━━━━━━━━━━━━━━━━━━━━"
+    
+    # Produtores: empacotam só os valores (com o horário do evento) e enfileiram
+    def _send_trade_signal_impl(self, side, price, indicators, capital):
+        """Envia alerta de sinal de trade"""
+        self._enqueue(PRIORITY_TRADE, 'TRADE_SIGNAL',
+                      (side, price, indicators['volume_usdt'], capital, time.time()))
+    
+    def _send_trade_close_impl(self, side, pnl_pct, reason, capital):
+        """Envia alerta de fechamento de trade"""
+        self._enqueue(PRIORITY_TRADE, 'TRADE_CLOSE', (side, pnl_pct, reason, capital))
+    
+    def _send_divergence_alert_impl(self, divergence):
+        """Envia alerta de divergência detectada"""
+        self._enqueue(PRIORITY_DIVERGENCE, 'DIVERGENCE', (
+            divergence['severity'], divergence['type'], divergence['indicator'], divergence['price'],
+            divergence['price_action'], divergence['indicator_action'], time.time()
+        ))
+    
+    def _send_backtest_report_impl(self, results):
+        """Envia relatório completo de backtest"""
+        self._enqueue(PRIORITY_REPORT, 'BACKTEST', (self._backtest_values(results),))
+
+
+class AsyncTelegramNotifier(_TelegramBase):
+    """Variante asyncio do notificador (aiohttp), para loops de trading baseados em asyncio
+    
+    Uso:
+        async with AsyncTelegramNotifier() as notifier:
+            notifier.set_credentials(token, chat_id)
+            asyncio.create_task(notifier.send_trade_signal(...))
+    """
+    
+    def __init__(self):
+        if aiohttp is None:
+            raise ImportError("AsyncTelegramNotifier requer aiohttp (pip install aiohttp)")
+        super().__init__()
+        self._http = None
+    
+    async def __aenter__(self):
+        self._http = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=10, keepalive_timeout=75),
+            timeout=aiohttp.ClientTimeout(total=10),
+            headers={'Content-Type': 'application/json'}
         )
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+    
+    async def aclose(self):
+        """Fecha a sessão aiohttp"""
+        if self._http is not None:
+            await self._http.close()
+            self._http = None
+    
+    async def send_message(self, text, parse_mode=None):
+        """Envia mensagem sem bloquear o event loop, com as mesmas retentativas da versão síncrona"""
+        if not self.token or not self.chat_id or self._http is None:
+            return None
+        
+        url = f"https://{API_HOST}{self._send_path}"
+        body = self._encode(text, parse_mode)
+        error = None
+        for attempt in range(self.MAX_ATTEMPTS):
+            try:
+                async with self._http.post(url, data=body) as response:
+                    status = response.status
+                    try:
+                        payload = _loads(await response.read())
+                    except ValueError:
+                        payload = {}
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = e
+                delay = self._backoff(attempt)
+            else:
+                if status not in self.RETRY_STATUS:
+                    if status >= 400:
+                        print(f"Erro ao enviar Telegram: HTTP {status} - {payload.get('description')}")
+                        return None
+                    return payload
+                
+                error = f"HTTP {status}"
+                delay = self._backoff(attempt)
+                if status == 429:
+                    delay = payload.get('parameters', {}).get('retry_after', delay)
+            
+            if attempt < self.MAX_ATTEMPTS - 1:
+                await asyncio.sleep(delay)
         
-        return self.send_message(message)
+        print(f"Erro ao enviar Telegram: {error}")
+        return None
+    
+    # No-ops até set_credentials (corrotinas, para poderem ser aguardadas)
+    async def send_trade_signal(self, side, price, indicators, capital):
+        """Envia alerta de sinal de trade"""
+    
+    async def send_trade_close(self, side, pnl_pct, reason, capital):
+        """Envia alerta de fechamento de trade"""
+    
+    async def send_divergence_alert(self, divergence):
+        """Envia alerta de divergência detectada"""
+    
+    async def send_backtest_report(self, results):
+        """Envia relatório completo de backtest"""
+    
+    async def _send_trade_signal_impl(self, side, price, indicators, capital):
+        return await self.send_message(
+            self._format_trade_signal(side, price, indicators['volume_usdt'], capital, time.time()), 'HTML')
+    
+    async def _send_trade_close_impl(self, side, pnl_pct, reason, capital):
+        return await self.send_message(self._format_trade_close(side, pnl_pct, reason, capital), 'HTML')
+    
+    async def _send_divergence_alert_impl(self, divergence):
+        return await self.send_message(self._format_divergence(
+            divergence['severity'], divergence['type'], divergence['indicator'], divergence['price'],
+            divergence['price_action'], divergence['indicator_action'], time.time()
+        ), 'HTML')
+    
+    async def _send_backtest_report_impl(self, results):
+        return await self.send_message(
+            _format_backtest(**self._backtest_values(results)), 'HTML')
@@ -0,0 +1,7 @@
+#!/usr/bin/env python3
+"""
+PONTO DE ENTRADA WSGI
+Produção: gunicorn -w 4 -k gthread --threads 8 wsgi:app
+"""
+
+from app import app